@@ -2,22 +2,37 @@ import logging
 from PIL import Image
 import fitz
 import io
+import numpy as np
 
-# Configure Logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by the application, see src/main.py
 logger = logging.getLogger(__name__)
 
 
 class COE:
+    # Text region boxes (left, top, right, bottom) in the resized 850x1000
+    # image. The fields lie in the top image, which starts at y=112, except
+    # block_no, which lies in the bottom image starting at y=206.
+    _BOXES = {
+        "student_name": (105, 112 + 20, 105 + 400, 112 + 20 + 20),
+        "course": (105, 112 + 40, 105 + 400, 112 + 40 + 20),
+        "student_no": (665, 112 + 20, 665 + 150, 112 + 20 + 20),
+        "acad_year": (665, 112 + 40, 665 + 150, 112 + 40 + 20),
+        "semester": (300, 112, 300 + 250, 112 + 17),
+        "block_no": (275, 206, 275 + 100, 206 + 25),
+    }
+
     def __init__(self, file_data):
         """
         Initialize the COE object.
 
         Parameters:
-            file_data (bytes or BytesIO): In-memory PDF or image file data.
+            file_data (bytes or file object): PDF or image file data, either in
+                memory or as a readable binary file (e.g. an upload's spooled file).
         """
         self.file_data = file_data
         self.image = None  # Holds the loaded image
+        self._arrays = {}  # Pixel arrays of the loaded image, keyed by mode
+        self._arrays_source = None  # Image the pixel arrays were taken from
         self.target_width = 850  # Target width for resizing
         self.target_height = 1000  # Target height for resizing
 
@@ -26,29 +41,6 @@ class COE:
         self.top_image_y = 112
         self.top_image_width = None  # Set dynamically after loading image
         self.top_image_height = 60
-        self.semester_x = 300
-        self.semester_width = 250
-        self.semester_height = 17
-        self.student_name_x = 105
-        self.student_name_y = 20
-        self.student_name_width = 400
-        self.student_name_height = 20
-        self.course_x = 105
-        self.course_y = 40
-        self.course_width = 400
-        self.course_height = 20
-        self.student_no_x = 665
-        self.student_no_y = 20
-        self.student_no_width = 150
-        self.student_no_height = 20
-        self.acad_year_x = 665
-        self.acad_year_y = 40
-        self.acad_year_width = 150
-        self.acad_year_height = 20
-        self.block_no_x = 275
-        self.block_no_y = 0
-        self.block_no_width = 100
-        self.block_no_height = 25
         self.bottom_image_x = 0
         self.bottom_image_y = 206
         self.cropped_width = 520
@@ -56,45 +48,85 @@ class COE:
 
     def load_file(self):
         """
-        Load the file (PDF or image). If it's a PDF, extract the first image.
+        Load the file (PDF or image) at the target dimensions (850x1000).
+        If it's a PDF, render its first image directly at that size.
         """
-        # Attempt to open as an image
         try:
-            self.image = Image.open(io.BytesIO(self.file_data))
-            logger.info("Image loaded successfully.")
-        except IOError:
-            # If not an image, try to open as PDF
-            try:
+            if self._read_file_data(5) == b"%PDF-":
                 self.image = self._extract_image_from_pdf()
-                logger.info("Image extracted from PDF successfully.")
-            except Exception as e:
-                logger.error(f"Failed to load file: {e}")
-                raise ValueError("Unsupported file format or corrupt data.")
+                logger.debug("Image rendered from PDF successfully.")
+            else:
+                if isinstance(self.file_data, bytes):
+                    image = Image.open(io.BytesIO(self.file_data))
+                else:
+                    # Let Pillow read the file object directly
+                    self.file_data.seek(0)
+                    image = Image.open(self.file_data)
+                if image.format == "JPEG":
+                    # Let libjpeg decode at a reduced scale closer to the target size
+                    image.draft("RGB", (self.target_width, self.target_height))
+                # Decode now instead of lazily on the first crop
+                image.load()
+                self.image = image
+                logger.debug("Image loaded successfully.")
+
+            # Usually a no-op for PDFs, which are already rendered at the target size
+            self.resize_image()
+        except Exception as e:
+            logger.error("Failed to load file: %s", e)
+            raise ValueError("Unsupported file format or corrupt data.")
+
+    def _read_file_data(self, size=-1):
+        """
+        Read the file data from its start, whether it is bytes or a file object.
+
+        Parameters:
+            size (int): The number of bytes to read, or -1 to read everything.
+
+        Returns:
+            bytes: The file data read.
+        """
+        if isinstance(self.file_data, bytes):
+            return self.file_data if size < 0 else self.file_data[:size]
+        self.file_data.seek(0)
+        return self.file_data.read(size)
 
     def _extract_image_from_pdf(self):
         """
-        Extract the first image from the PDF.
+        Render the first image of the PDF's first page directly at the target dimensions.
 
         Returns:
-            PIL Image: The extracted image from the PDF.
+            PIL Image: The rendered image of the PDF.
         """
-        logger.info("Extracting image from PDF...")
-        pdf_document = fitz.open(stream=self.file_data, filetype="pdf")
-
-        # Extract the first image from the first page
-        for page_num in range(len(pdf_document)):
-            page = pdf_document[page_num]
+        logger.debug("Rendering image from PDF...")
+        # PyMuPDF only opens in-memory streams, so read a file object here
+        with fitz.open(stream=self._read_file_data(), filetype="pdf") as pdf_document:
+            if len(pdf_document) == 0:
+                logger.error("No pages found in the PDF.")
+                raise ValueError("The provided PDF does not contain any pages.")
+
+            # The crop boxes are relative to the embedded scan, not the page,
+            # so find where the first image of the first page is placed
+            page = pdf_document.load_page(0)
             image_list = page.get_images(full=True)
-            if image_list:
-                for img in image_list:
-                    xref = img[0]
-                    base_image = pdf_document.extract_image(xref)
-                    image_bytes = base_image["image"]
-                    image = Image.open(io.BytesIO(image_bytes))
-                    logger.info(f"Image extracted from page {page_num + 1}.")
-                    return image
-        logger.error("No images found in the PDF.")
-        raise ValueError("The provided PDF does not contain any images.")
+            image_rects = page.get_image_rects(image_list[0][0]) if image_list else []
+            if not image_rects or image_rects[0].is_empty:
+                logger.error("No images found in the PDF.")
+                raise ValueError("The provided PDF does not contain any images.")
+
+            # Rasterize only that area, straight to the target size, so no
+            # separate decode and resize of the embedded image is needed
+            clip = image_rects[0]
+            matrix = fitz.Matrix(
+                self.target_width / clip.width,
+                self.target_height / clip.height,
+            )
+            pixmap = page.get_pixmap(matrix=matrix, clip=clip, alpha=False)
+
+            # Read the samples through a memoryview instead of a bytes copy
+            image = Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples_mv)
+            logger.debug("Page 1 image rendered at %dx%d.", pixmap.width, pixmap.height)
+            return image
 
     def resize_image(self):
         """
@@ -102,8 +134,49 @@ class COE:
         """
         if not self.image:
             raise ValueError("No image loaded. Please load a file first.")
-        self.image = self.image.resize((self.target_width, self.target_height))
-        logger.info(f"Image resized to {self.target_width}x{self.target_height}.")
+        if self.image.size == (self.target_width, self.target_height):
+            # Already rendered at the target size (e.g. from a PDF page)
+            return
+        width, height = self.image.size
+        if (
+            width % self.target_width == 0
+            and height % self.target_height == 0
+            and self.image.mode in ("RGB", "L")
+        ):
+            # An integer multiple of the target size only needs a box reduction
+            self.image = self.image.reduce(
+                (width // self.target_width, height // self.target_height)
+            )
+        else:
+            # Reduce by an integer factor first, then resample the remainder
+            self.image = self.image.resize(
+                (self.target_width, self.target_height),
+                resample=Image.BILINEAR,
+                reducing_gap=2.0,
+            )
+        logger.debug("Image resized to %dx%d.", self.target_width, self.target_height)
+
+    def _as_array(self, mode="RGB"):
+        """
+        Get the loaded image as a uint8 array in the given mode, converting it only once.
+
+        Parameters:
+            mode (str): "RGB" for an H x W x 3 array, "L" for an H x W grayscale array.
+
+        Returns:
+            numpy.ndarray: The pixel data of the loaded image.
+        """
+        if not self.image:
+            raise ValueError("No image loaded. Please load a file first.")
+        if self._arrays_source is not self.image:
+            self._arrays = {}
+            self._arrays_source = self.image
+        if mode not in self._arrays:
+            image = self.image
+            if image.mode != mode:
+                image = image.convert(mode)
+            self._arrays[mode] = np.asarray(image)
+        return self._arrays[mode]
 
     def get_coe_image(self):
         """
@@ -130,15 +203,13 @@ class COE:
         if not self.top_image_width:
             self.top_image_width = self.image.width
 
-        # Coordinates for cropping the top image
-        box = (
-            self.top_image_x,
-            self.top_image_y,
-            self.top_image_x + self.top_image_width,
-            self.top_image_y + self.top_image_height,
-        )
-        top_image = self.image.crop(box)
-        logger.info("Top image extracted successfully.")
+        # Slice the top image out of the loaded image
+        image_array = self._as_array()
+        top_image = Image.fromarray(image_array[
+            self.top_image_y:self.top_image_y + self.top_image_height,
+            self.top_image_x:self.top_image_x + self.top_image_width,
+        ])
+        logger.debug("Top image extracted successfully.")
         return top_image
 
     def get_bottom_image(self):
@@ -155,15 +226,13 @@ class COE:
         if self.cropped_height is None:
             self.cropped_height = self.target_height - 306
 
-        # Coordinates for cropping the bottom image
-        box = (
-            self.bottom_image_x,
-            self.bottom_image_y,
-            self.bottom_image_x + self.cropped_width,
-            self.bottom_image_y + self.cropped_height,
-        )
-        bottom_image = self.image.crop(box)
-        logger.info("Bottom image extracted successfully.")
+        # Slice the bottom image out of the loaded image
+        image_array = self._as_array()
+        bottom_image = Image.fromarray(image_array[
+            self.bottom_image_y:self.bottom_image_y + self.cropped_height,
+            self.bottom_image_x:self.bottom_image_x + self.cropped_width,
+        ])
+        logger.debug("Bottom image extracted successfully.")
         return bottom_image
 
     def extract_semester(self):
@@ -182,7 +251,7 @@ class COE:
         Returns:
             PIL Image: The block number image.
         """
-        return self._extract_text_region("block_no", from_bottom=True)
+        return self._extract_text_region("block_no")
 
     def extract_student_name(self):
         """
@@ -220,68 +289,26 @@ class COE:
         """
         return self._extract_text_region("acad_year")
 
-    def _extract_text_region(self, field, from_bottom=False):
+    def _extract_text_region(self, field):
         """
         Helper method to extract various fields based on predefined coordinates.
 
         Parameters:
             field (str): The field to extract.
-            from_bottom (bool): Whether to extract from the bottom image.
         
         Returns:
-            PIL Image: The extracted region.
-        """
-        coordinates = {
-            "student_name": (
-                self.student_name_x,
-                self.student_name_y,
-                self.student_name_width,
-                self.student_name_height,
-            ),
-            "course": (
-                self.course_x,
-                self.course_y,
-                self.course_width,
-                self.course_height,
-            ),
-            "student_no": (
-                self.student_no_x,
-                self.student_no_y,
-                self.student_no_width,
-                self.student_no_height,
-            ),
-            "acad_year": (
-                self.acad_year_x,
-                self.acad_year_y,
-                self.acad_year_width,
-                self.acad_year_height,
-            ),
-            "semester": (
-                self.semester_x,
-                0,
-                self.semester_width,
-                self.semester_height,
-            ),
-            "block_no": (
-                self.block_no_x,
-                self.block_no_y,
-                self.block_no_width,
-                self.block_no_height,
-            ),
-        }
-
-        if field not in coordinates:
+            PIL Image: The extracted region, in grayscale ("L" mode).
+        """
+        if field not in self._BOXES:
             raise ValueError("Invalid field name.")
 
-        x, y, width, height = coordinates[field]
-        if from_bottom:
-            image_source = self.get_bottom_image()
-        else:
-            image_source = self.get_top_image()
+        left, top, right, bottom = self._BOXES[field]
 
-        # Crop the text region using predefined dimensions
-        field_image = image_source.crop((x, y, x + width, y + height))
-        logger.info(f"{field} image extracted successfully.")
+        # Slice the text region straight out of the grayscale image, since
+        # only the luminance is needed to read the text
+        image_array = self._as_array("L")
+        field_image = Image.fromarray(image_array[top:bottom, left:right])
+        logger.debug("%s image extracted successfully.", field)
         return field_image
 
     def extract_classes(self):
@@ -289,49 +316,44 @@ class COE:
         Extract and store each class image (class code, unit count, subject name, and schedule) into a list of dictionaries.
 
         Returns:
-            list of dict: List containing class data with images.
+            list of dict: List containing class data with grayscale images.
         """
         if not self.image:
             raise ValueError("No image loaded. Please load a file first.")
 
-        bottom_image = self.get_bottom_image()
-
-        # Start cropping from the top of the bottom image
-        y = 30
-        class_index = 1
-        classes_data = []
-
-        while y + 45 <= bottom_image.height:
-            logger.info(f"Extracting class {class_index}...")
-
-            # Crop the entire class row
-            class_image = bottom_image.crop((0, y, self.cropped_width, y + 45))
-
-            # Crop class code (left part, 90px wide)
-            class_code_image = class_image.crop((0, 0, 90, 45))
-
-            # Crop unit count (right part, 50px wide)
-            unit_count_image = class_image.crop((490, 5, 520, 40))
-
-            # Crop middle part of the class (excluding class code and unit count)
-            middle_image = class_image.crop((90, 0, 470, 45))
-
-            # Split the middle part into subject name (top 22px) and schedule (bottom 23px)
-            subject_name_image = middle_image.crop((0, 0, 380, 22))
-            schedule_image = middle_image.crop((0, 22, 380, 45))
+        # Dynamically set cropped height if not already set
+        if self.cropped_height is None:
+            self.cropped_height = self.target_height - 306
 
-            # Store the class data as a dictionary and append it to the list
-            class_data = {
-                "class_code": class_code_image,
-                "unit_count": unit_count_image,
-                "subject_name": subject_name_image,
-                "schedule": schedule_image,
+        # Every class row is 45px tall and starts 30px below the top of the
+        # bottom image, so view the rows as one (rows, 45, width, ...) array
+        row_count = max(0, (self.cropped_height - 30) // 45)
+        rows_y = self.bottom_image_y + 30
+        image_array = self._as_array("L")
+        rows = image_array[
+            rows_y:rows_y + row_count * 45,
+            self.bottom_image_x:self.bottom_image_x + self.cropped_width,
+        ]
+        rows = rows.reshape(row_count, 45, *rows.shape[1:])
+
+        # Slice each part out of all the rows at once: class code (left part,
+        # 90px wide), unit count (right part), and the middle part split into
+        # subject name (top 22px) and schedule (bottom 23px)
+        class_codes = rows[:, :, 0:90]
+        unit_counts = rows[:, 5:40, 490:520]
+        subject_names = rows[:, 0:22, 90:470]
+        schedules = rows[:, 22:45, 90:470]
+
+        # Store the class data as a list of dictionaries
+        classes_data = [
+            {
+                "class_code": Image.fromarray(class_codes[index]),
+                "unit_count": Image.fromarray(unit_counts[index]),
+                "subject_name": Image.fromarray(subject_names[index]),
+                "schedule": Image.fromarray(schedules[index]),
             }
-            classes_data.append(class_data)
-
-            # Increment y to move to the next class row
-            y += 45
-            class_index += 1
+            for index in range(row_count)
+        ]
 
-        logger.info("Class extraction completed.")
-        return classes_data
\ No newline at end of file
+        logger.debug("Class extraction completed, %d classes found.", row_count)
+        return classes_data
@@ -1,20 +1,61 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .routers.image import router as img_router
+from PIL import Image
+from .COE import COE
+from .middleware import UploadSizeLimitMiddleware
+from .routers.image import EXECUTOR, encode_png, router as img_router
+import fitz
 import logging
 import os
 import uvicorn
 
 # Configure Logging
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "WARNING").upper())
 logger = logging.getLogger(__name__)
 
+# Largest COE upload accepted, in bytes. A COE PDF is a single page, so
+# anything bigger is rejected before it is parsed.
+MAX_PDF_BYTES = int(os.environ.get("MAX_PDF_BYTES", 20 * 1024 * 1024))
+
+def warm_up():
+    """
+    Run a PDF page with a blank scan through the whole pipeline once: render,
+    crop, and encode a colour and a grayscale region. The first request then
+    does not pay for loading MuPDF, Pillow and the PNG encoder, or for setting
+    up their first buffers.
+    """
+    with fitz.open() as pdf_document:
+        # The COE is read from the page's embedded scan, so place a blank one
+        scan = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 85, 100), False)
+        scan.clear_with(255)
+        pdf_document.new_page().insert_image(fitz.Rect(36, 36, 576, 756), pixmap=scan)
+        pdf_bytes = pdf_document.tobytes()
+
+    coe_instance = COE(pdf_bytes)
+    coe_instance.load_file()
+    # Encode on the executor, which also starts its first worker thread
+    EXECUTOR.submit(encode_png, coe_instance.get_coe_image()).result()
+    EXECUTOR.submit(encode_png, coe_instance.extract_course()).result()
+    Image.new("RGB", (1234, 2345)).resize((850, 1000), Image.BILINEAR)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_up()
+    logger.info("PDF renderer and image resampler warmed up.")
+    yield
+
 chaturmeytsimg = FastAPI(
     title="Chat-Ur-Meyts Image API",
     description="API for Chat-Ur-Meyts Image",
-    version="1.0"
+    version="1.0",
+    lifespan=lifespan
 )
 
+chaturmeytsimg.add_middleware(UploadSizeLimitMiddleware, max_bytes=MAX_PDF_BYTES)
+
+# Added last so that it wraps the middleware above, and the 413 responses
+# also carry the CORS headers
 chaturmeytsimg.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -29,5 +70,15 @@ async def root():
     return {"message": "Hello klasmeyts! This is the root of the Chat-Ur-Meyts Image API."}
 
 if __name__ == "__main__":
-    uvicorn.run(chaturmeytsimg, host="0.0.0.0", port=int(
-        os.environ.get("PORT", 8000)))
\ No newline at end of file
+    # uvicorn picks uvloop and httptools automatically when they are installed.
+    # One worker by default: the COE image cache (COE_CACHE_SIZE), the
+    # EXECUTOR and RENDER_EXECUTOR threads in src/routers/image.py are all
+    # per process. Every extra worker multiplies the cache memory and the
+    # concurrent renders, and repeat uploads of a COE often miss the cache of
+    # the worker they land on.
+    uvicorn.run(
+        "src.main:chaturmeytsimg",
+        host="0.0.0.0",
+        port=int(os.environ.get("PORT", 8000)),
+        workers=int(os.environ.get("WEB_CONCURRENCY", 1)),
+    )
@@ -0,0 +1,44 @@
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+
+
+class UploadSizeLimitMiddleware:
+    """
+    ASGI middleware rejecting request bodies larger than max_bytes with 413.
+
+    Bodies declaring a bigger Content-Length are rejected before any of them
+    is read. Bodies without one (chunked uploads) are counted as they are
+    received, and stop being read as soon as they pass the limit, so they are
+    never spooled in full.
+    """
+
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.detail = f"File too large. The COE PDF must not exceed {max_bytes // (1024 * 1024)} MiB."
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > self.max_bytes:
+            response = JSONResponse(status_code=413, content={"detail": self.detail})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Raised while the endpoint reads the body, FastAPI passes
+                    # HTTPExceptions on and answers them as usual
+                    raise HTTPException(status_code=413, detail=self.detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
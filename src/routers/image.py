@@ -1,197 +1,470 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException
+from fastapi import APIRouter, File, Request, UploadFile, HTTPException
+import asyncio
+import base64
+import hashlib
 import logging
+import os
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from starlette.responses import StreamingResponse
+import numpy as np
+from starlette.responses import JSONResponse, Response
 from ..COE import COE
 
+try:
+    # Optional faster PNG encoder, see the Pipfile. Pillow is used when it is
+    # not installed.
+    import imagecodecs
+except ImportError:
+    imagecodecs = None
+
 router = APIRouter(prefix="/image", tags=["Image"])
 logger = logging.getLogger(__name__)
 
-async def process_coe_file(coe_file: UploadFile) -> COE:
+# Resized COE images keyed by a hash of the uploaded file, so that requests
+# for different regions of the same COE skip the PDF parse and resize.
+# Entries are evicted least recently used first. Every entry is an 850x1000
+# RGB image of about 2.4 MiB, so a full cache holds about 156 MiB.
+COE_CACHE_SIZE = 64
+_coe_cache = OrderedDict()
+
+# Worker threads for the blocking hashing and image encoding, so that they do
+# not hold up the event loop while other uploads are received
+EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+# Separate worker threads for the PDF rendering. Their count caps how many
+# PDFs are rendered at once, so a burst of uploads degrades to waiting instead
+# of exhausting memory, and the renders never take the EXECUTOR workers the
+# requests that hit the cache hash and encode on, whatever the core count.
+RENDER_EXECUTOR = ThreadPoolExecutor(max_workers=max(1, min(os.cpu_count() or 1, 4)))
+
+# zlib level used for PNG responses; the client decodes them once, so fast
+# encoding matters more than the smallest output. Raise it (up to 9) where
+# bandwidth is the bottleneck instead.
+PNG_COMPRESS_LEVEL = int(os.environ.get("PNG_COMPRESS_LEVEL", 1))
+
+# Lossy encodings offered, in order of preference, for the regions that are
+# whole parts of the page rather than single lines of text. The text crops are
+# always served as PNG, since lossy artifacts around the glyphs hurt the OCR.
+LOSSY_REGIONS = ("coe", "top", "bottom")
+LOSSY_FORMATS = {
+    "image/webp": ("WEBP", {"quality": 80, "method": 0}),
+    "image/jpeg": ("JPEG", {"quality": 85}),
+}
+
+# Headers of the image and archive responses. Their bodies are already
+# deflated, so ask proxies and CDNs not to transform (re-compress) them.
+RESPONSE_HEADERS = {"Cache-Control": "no-transform"}
+
+# Headers of the responses whose format depends on the Accept header, so that
+# caches keep one copy per format instead of serving one format to everyone
+NEGOTIATED_RESPONSE_HEADERS = {**RESPONSE_HEADERS, "Vary": "Accept"}
+
+# COE regions served as PNG images, keyed by name: the COE method extracting
+# the region, the endpoint description and the response description. Each
+# region is served at /image/<name> (the full COE at /image) and bundled in
+# the /image/all archive.
+REGIONS = {
+    "coe": ("get_coe_image", "Extract the image of the COE PDF",
+            "A PNG image of the COE PDF."),
+    "course": ("extract_course", "Extract the course name image of the COE PDF",
+               "A PNG image of the course name section."),
+    "student_name": ("extract_student_name", "Extract the student name image of the COE PDF",
+                     "A PNG image of the student name section."),
+    "student_no": ("extract_student_no", "Extract the student number image of the COE PDF",
+                   "A PNG image of the student number section."),
+    "acad_year": ("extract_acad_year", "Extract the academic year image of the COE PDF",
+                  "A PNG image of the academic year section."),
+    "year_level": ("extract_acad_year", "Extract the year level image of the COE PDF",
+                   "A PNG image of the year level section."),
+    "semester": ("extract_semester", "Extract the semester image of the COE PDF",
+                 "A PNG image of the semester section."),
+    "block_no": ("extract_block_no", "Extract the block number image of the COE PDF",
+                 "A PNG image of the block number section."),
+    "top": ("get_top_image", "Extract the top part image of the COE PDF",
+            "A PNG image of the top section."),
+    "bottom": ("get_bottom_image", "Extract the bottom part image of the COE PDF",
+               "A PNG image of the bottom section."),
+}
+
+def cache_coe_image(cache_key: bytes, image) -> None:
     """
-    Helper function to process the uploaded COE PDF file.
+    Store a resized COE image in the cache, evicting the least recently used
+    images while the cache holds more than COE_CACHE_SIZE of them.
 
     Parameters:
-        coe_file (UploadFile): The uploaded COE PDF file.
-
-    Returns:
-        COE: An instance of the COE class after processing.
+        cache_key (bytes): The hash of the uploaded file.
+        image (PIL Image): The resized COE image.
     """
-    if not coe_file.filename or not coe_file.filename.lower().endswith('.pdf'):
-        raise HTTPException(status_code=400, detail="Invalid file type. Please upload a valid PDF file.")
-
-    try:
-        # Read the uploaded file into memory
-        file_bytes = await coe_file.read()
-
-        # Initialize COE object with in-memory bytes
-        coe_instance = COE(file_bytes)
-
-        # Load and resize the COE image
-        coe_instance.load_file()
-        coe_instance.resize_image()
-
-        return coe_instance
+    _coe_cache[cache_key] = image
+    _coe_cache.move_to_end(cache_key)
+    while len(_coe_cache) > COE_CACHE_SIZE:
+        _coe_cache.popitem(last=False)
 
-    except AttributeError as ae:
-        logger.error(f"Attribute error while processing {getattr(coe_file, 'filename', 'unknown file')}: {str(ae)}")
-        raise HTTPException(status_code=400, detail="File processing failed. Ensure the uploaded file is a valid PDF.")
-    except Exception as e:
-        logger.error(f"Unexpected error while processing {getattr(coe_file, 'filename', 'unknown file')}: {str(e)}")
-        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again.")
+def load_coe_image(coe_instance: COE) -> None:
+    """
+    Load the COE image at its target size. Blocking, run it in the RENDER_EXECUTOR.
 
-def image_response(image):
+    Parameters:
+        coe_instance (COE): The COE to load the image of.
     """
-    Convert a PIL image to a StreamingResponse.
+    coe_instance.load_file()
+
+def hash_file(file) -> bytes:
     """
-    img_byte_arr = BytesIO()
-    image.save(img_byte_arr, format='PNG')
-    img_byte_arr.seek(0)
-    return StreamingResponse(img_byte_arr, media_type="image/png")
+    Hash a file from its start through a preallocated buffer. Blocking, run it in the EXECUTOR.
 
-class Responses:
-    @staticmethod
-    def png_image_response(description: str = "A PNG image file."):
-        return {
-            200: {
-                "description": description,
-                "content": {"image/png": {}},
-            },
-            400: {
-                "description": "File processing failed. Ensure the uploaded file is a valid PDF.",
-            },
-            500: {
-                "description": "An unexpected error occurred."
-            }
-        }
+    Parameters:
+        file (BinaryIO): The file to hash, rewound for reading afterwards.
 
+    Returns:
+        bytes: The BLAKE2b digest of the file.
+    """
+    file.seek(0)
+    file_hash = hashlib.file_digest(file, lambda: hashlib.blake2b(digest_size=16))
+    file.seek(0)
+    return file_hash.digest()
 
-@router.post("", description="Extract the image of the COE PDF",
-             responses=Responses.png_image_response("A PNG image of the COE PDF."))
-async def extract_image_from_pdf(coe: UploadFile = File(...)):
-    logger.info("Extracting image from COE PDF")
+async def hash_upload(coe_file: UploadFile) -> bytes:
+    """
+    Hash the uploaded file without reading all of it into memory.
 
-    coe_instance = await process_coe_file(coe)
+    The spooled upload is read in a single worker thread call, instead of
+    one thread hop per chunk once Starlette has rolled it over to disk.
 
-    # Extract the COE image
-    coe_image = coe_instance.get_coe_image()
+    Parameters:
+        coe_file (UploadFile): The uploaded COE PDF file.
 
-    # Return the image as a StreamingResponse
-    return image_response(coe_image)
+    Returns:
+        bytes: The BLAKE2b digest of the file.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(EXECUTOR, hash_file, coe_file.file)
 
-@router.post("/course", description="Extract the course name image of the COE PDF",
-             responses=Responses.png_image_response("A PNG image of the course name section."))
-async def extract_course_image_from_pdf(coe: UploadFile = File(...)):
-    logger.info("Extracting course name image from COE PDF")
+async def process_coe_file(coe_file: UploadFile) -> COE:
+    """
+    Helper function to process the uploaded COE PDF file.
 
-    coe_instance = await process_coe_file(coe)
+    Parameters:
+        coe_file (UploadFile): The uploaded COE PDF file.
 
-    # Extract course image
-    course_image = coe_instance.extract_course()
+    Returns:
+        COE: An instance of the COE class after processing.
+    """
+    # Check the PDF magic bytes rather than the file name, so that non-PDFs
+    # are rejected before any hashing or parsing
+    header = await coe_file.read(5)
+    await coe_file.seek(0)
+    if header != b"%PDF-":
+        raise HTTPException(status_code=400, detail="Invalid file type. Please upload a valid PDF file.")
 
-    # Return the image as a StreamingResponse
-    return image_response(course_image)
+    try:
+        cache_key = await hash_upload(coe_file)
 
-@router.post("/student_name", description="Extract the student name image of the COE PDF",
-             responses=Responses.png_image_response("A PNG image of the student name section."))
-async def extract_student_name_image_from_pdf(coe: UploadFile = File(...)):
-    logger.info("Extracting student name image from COE PDF")
+        cached_image = _coe_cache.get(cache_key)
+        if cached_image is not None:
+            # Reuse the already loaded and resized image of this COE,
+            # the file itself never has to be read into memory
+            _coe_cache.move_to_end(cache_key)
+            coe_instance = COE(None)
+            coe_instance.image = cached_image.copy()
+            return coe_instance
 
-    coe_instance = await process_coe_file(coe)
+        # Initialize COE object with the spooled upload, which is only read
+        # while loading the image on a worker thread
+        coe_instance = COE(coe_file.file)
 
-    # Extract student name image
-    student_name_image = coe_instance.extract_student_name()
+        # Load the COE image on a worker thread
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(RENDER_EXECUTOR, load_coe_image, coe_instance)
 
-    # Return the image as a StreamingResponse
-    return image_response(student_name_image)
+        cache_coe_image(cache_key, coe_instance.image.copy())
 
-@router.post("/student_no", description="Extract the student number image of the COE PDF",
-             responses=Responses.png_image_response("A PNG image of the student number section."))
-async def extract_student_no_image_from_pdf(coe: UploadFile = File(...)):
-    logger.info("Extracting student number image from COE PDF")
+        return coe_instance
 
-    coe_instance = await process_coe_file(coe)
+    except AttributeError as ae:
+        logger.error("Attribute error while processing %s: %s", coe_file.filename or "unknown file", ae)
+        raise HTTPException(status_code=400, detail="File processing failed. Ensure the uploaded file is a valid PDF.")
+    except Exception:
+        logger.exception("Unexpected error while processing %s", coe_file.filename or "unknown file")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred. Please try again.")
 
-    # Extract student number image
-    student_no_image = coe_instance.extract_student_no()
+def encode_png(image):
+    """
+    Encode a PIL image as PNG bytes.
+    """
+    if imagecodecs is not None and image.mode == "RGB":
+        # Skip the per-row filter selection, which takes most of the encode
+        # time and barely shrinks the rendered page
+        return imagecodecs.png_encode(np.asarray(image), level=PNG_COMPRESS_LEVEL,
+                                      filter=imagecodecs.PNG.FILTER.NONE)
+    img_byte_arr = BytesIO()
+    image.save(img_byte_arr, format='PNG', compress_level=PNG_COMPRESS_LEVEL, optimize=False)
+    return img_byte_arr.getvalue()
 
-    # Return the image as a StreamingResponse
-    return image_response(student_no_image)
+def encode_lossy(image, media_type):
+    """
+    Encode a PIL image as WebP or JPEG bytes, see LOSSY_FORMATS.
+    """
+    image_format, params = LOSSY_FORMATS[media_type]
+    img_byte_arr = BytesIO()
+    image.convert("RGB").save(img_byte_arr, format=image_format, **params)
+    return img_byte_arr.getvalue()
 
-@router.post("/acad_year", description="Extract the academic year image of the COE PDF",
-             responses=Responses.png_image_response("A PNG image of the academic year section."))
-async def extract_year_level_image_from_pdf(coe: UploadFile = File(...)):
-    logger.info("Extracting acad year image from COE PDF")
+def parse_accept(request: Request):
+    """
+    Parse the Accept header of a request.
 
-    coe_instance = await process_coe_file(coe)
+    Parameters:
+        request (Request): The request to parse the Accept header of.
 
-    # Extract acad year image
-    acad_year_image = coe_instance.extract_acad_year()
+    Returns:
+        dict: The q-value of every media range in the header, keyed by media range.
+    """
+    media_ranges = {}
+    for part in request.headers.get("accept", "").split(","):
+        media_range, *params = part.split(";")
+        media_range = media_range.strip().lower()
+        if not media_range:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        media_ranges[media_range] = quality
+    return media_ranges
+
+def accepts_over(request: Request, media_type: str, default_media_type: str):
+    """
+    Check whether a request explicitly accepts a media type at least as much as the default one.
 
-    # Return the image as a StreamingResponse
-    return image_response(acad_year_image)
+    Parameters:
+        request (Request): The request to check the Accept header of.
+        media_type (str): The media type to serve instead of the default one.
+        default_media_type (str): The media type served otherwise.
 
-@router.post("/year_level", description="Extract the year level image of the COE PDF",
-             responses=Responses.png_image_response("A PNG image of the year level section."))
-async def extract_year_level_image_from_pdf(coe: UploadFile = File(...)):
-    logger.info("Extracting year level image from COE PDF")
+    Returns:
+        bool: True if the media type is named in the Accept header with a
+            q-value above 0 and not below the default media type's q-value.
+    """
+    media_ranges = parse_accept(request)
+    quality = media_ranges.get(media_type, 0.0)
+    # The default media type may also be accepted through a wildcard
+    default_ranges = (default_media_type, default_media_type.split("/")[0] + "/*", "*/*")
+    default_quality = max(media_ranges.get(media_range, 0.0) for media_range in default_ranges)
+    return quality > 0 and quality >= default_quality
+
+def negotiate_media_type(request: Request, name: str):
+    """
+    Pick the media type of a region image from the Accept header of the request.
 
-    coe_instance = await process_coe_file(coe)
+    Parameters:
+        request (Request): The request for the region image.
+        name (str): The name of the region in REGIONS.
 
-    # Extract year level image
-    year_level_image = coe_instance.extract_acad_year()
+    Returns:
+        str: A media type of LOSSY_FORMATS, or "image/png" by default.
+    """
+    if name in LOSSY_REGIONS:
+        for media_type in LOSSY_FORMATS:
+            if accepts_over(request, media_type, "image/png"):
+                return media_type
+    return "image/png"
 
-    # Return the image as a StreamingResponse
-    return image_response(year_level_image)
+async def image_response(image, media_type="image/png", headers=RESPONSE_HEADERS):
+    """
+    Convert a PIL image to a Response of the given media type, encoding it on a worker thread.
+    """
+    loop = asyncio.get_running_loop()
+    if media_type == "image/png":
+        image_bytes = await loop.run_in_executor(EXECUTOR, encode_png, image)
+    else:
+        image_bytes = await loop.run_in_executor(EXECUTOR, encode_lossy, image, media_type)
+    return Response(content=image_bytes, media_type=media_type, headers=headers)
+
+# Error responses shared by every endpoint, built once for all the routes
+ERROR_RESPONSES = {
+    400: {
+        "description": "File processing failed. Ensure the uploaded file is a valid PDF.",
+    },
+    413: {
+        "description": "The uploaded file is too large.",
+    },
+    500: {
+        "description": "An unexpected error occurred."
+    }
+}
+
+# OpenAPI description of the Vary header of NEGOTIATED_RESPONSE_HEADERS
+VARY_ACCEPT_HEADER = {
+    "Vary": {
+        "description": "Accept, since the format of the response depends on it.",
+        "schema": {"type": "string"},
+    }
+}
 
-@router.post("/semester", description="Extract the semester image of the COE PDF",
-             responses=Responses.png_image_response("A PNG image of the semester section."))
-async def extract_semester_image_from_pdf(coe: UploadFile = File(...)):
-    logger.info("Extracting semester image from COE PDF")
+class Responses:
+    @staticmethod
+    def png_image_response(description: str = "A PNG image file.", lossy: bool = False):
+        response = {
+            "description": description,
+            "content": {"image/png": {}},
+        }
+        if lossy:
+            # Served instead of PNG when named in the Accept header
+            response["description"] += (" Served as " + " or ".join(LOSSY_FORMATS)
+                                        + " instead when the Accept header prefers it.")
+            response["content"].update((media_type, {}) for media_type in LOSSY_FORMATS)
+            response["headers"] = VARY_ACCEPT_HEADER
+        return {
+            200: response,
+            **ERROR_RESPONSES,
+        }
 
-    coe_instance = await process_coe_file(coe)
+    @staticmethod
+    def all_images_response(description: str = "A ZIP archive of PNG image files."):
+        return {
+            200: {
+                "description": description + (
+                    " A ZIP archive of <name>.png and classes/<n>/<part>.png files by"
+                    " default, or, when the Accept header prefers application/json,"
+                    " a JSON object of the same images as base64 encoded PNGs."
+                ),
+                "headers": VARY_ACCEPT_HEADER,
+                "content": {
+                    "application/zip": {},
+                    "application/json": {
+                        "schema": {
+                            "type": "object",
+                            "properties": {
+                                "classes": {
+                                    "type": "array",
+                                    "items": {
+                                        "type": "object",
+                                        "additionalProperties": {"type": "string", "format": "byte"},
+                                    },
+                                },
+                            },
+                            "additionalProperties": {"type": "string", "format": "byte"},
+                        },
+                    },
+                },
+            },
+            **ERROR_RESPONSES,
+        }
 
-    # Extract semester image
-    semester_image = coe_instance.extract_semester()
 
-    # Return the image as a StreamingResponse
-    return image_response(semester_image)
+async def serve_region_image(request: Request, coe_file: UploadFile, name: str) -> Response:
+    """
+    Process the uploaded COE PDF file and respond with the image of one region.
 
-@router.post("/block_no", description="Extract the block number image of the COE PDF",
-             responses=Responses.png_image_response("A PNG image of the block number section."))
-async def extract_top_image_from_pdf(coe: UploadFile = File(...)):
-    logger.info("Extracting block number image from COE PDF")
+    Parameters:
+        request (Request): The request, whose Accept header picks the image format.
+        coe_file (UploadFile): The uploaded COE PDF file.
+        name (str): The name of the region in REGIONS.
 
-    coe_instance = await process_coe_file(coe)
+    Returns:
+        Response: The image of the region, PNG unless the client accepts a lossy format.
+    """
+    logger.debug("Extracting %s image from COE PDF", name)
 
-    # Extract block number image
-    block_no_image = coe_instance.extract_block_no()
+    coe_instance = await process_coe_file(coe_file)
 
-    # Return the image as a StreamingResponse
-    return image_response(block_no_image)
+    # Extract the region image
+    extractor, _, _ = REGIONS[name]
+    region_image = getattr(coe_instance, extractor)()
 
-@router.post("/top", description="Extract the top part image of the COE PDF",
-             responses=Responses.png_image_response("A PNG image of the top section"))
-async def extract_top_image_from_pdf(coe: UploadFile = File(...)):
-    logger.info("Extracting top image from COE PDF")
+    # Return the image in the format negotiated with the client
+    headers = NEGOTIATED_RESPONSE_HEADERS if name in LOSSY_REGIONS else RESPONSE_HEADERS
+    return await image_response(region_image, negotiate_media_type(request, name), headers)
 
-    coe_instance = await process_coe_file(coe)
+def region_endpoint(name: str):
+    """
+    Create the endpoint serving the image of one region.
+    """
+    async def endpoint(request: Request, coe: UploadFile = File(...)):
+        return await serve_region_image(request, coe, name)
 
-    # Extract top image
-    top_image = coe_instance.get_top_image()
+    return endpoint
 
-    # Return the image as a StreamingResponse
-    return image_response(top_image)
+for region_name, (_, region_description, response_description) in REGIONS.items():
+    router.post(
+        "" if region_name == "coe" else f"/{region_name}",
+        name=f"extract_{region_name}_image_from_pdf",
+        description=region_description,
+        responses=Responses.png_image_response(response_description,
+                                               lossy=region_name in LOSSY_REGIONS),
+    )(region_endpoint(region_name))
 
-@router.post("/bottom", description="Extract the bottom part image of the COE PDF",
-             responses=Responses.png_image_response("A PNG image of the bottom section"))
-async def extract_top_image_from_pdf(coe: UploadFile = File(...)):
-    logger.info("Extracting bottom image from COE PDF")
+def zip_archive_response(region_pngs, classes_pngs):
+    """
+    Bundle the PNG images of every region and class into a ZIP archive Response.
+    """
+    # Store the PNG images as they are, since they are already compressed
+    zip_byte_arr = BytesIO()
+    with zipfile.ZipFile(zip_byte_arr, "w", compression=zipfile.ZIP_STORED) as zip_file:
+        for name, png_image in region_pngs.items():
+            zip_file.writestr(f"{name}.png", png_image)
+        for class_index, class_pngs in enumerate(classes_pngs, start=1):
+            for part, png_image in class_pngs.items():
+                zip_file.writestr(f"classes/{class_index}/{part}.png", png_image)
+
+    # Return the archive as a Response, it is already fully in memory
+    return Response(content=zip_byte_arr.getvalue(), media_type="application/zip",
+                    headers=NEGOTIATED_RESPONSE_HEADERS)
+
+def base64_json_response(region_pngs, classes_pngs):
+    """
+    Return the PNG images of every region and class as base64 strings in a JSONResponse.
+    """
+    def to_base64(png_image):
+        return base64.b64encode(png_image).decode("ascii")
+
+    content = {name: to_base64(png_image) for name, png_image in region_pngs.items()}
+    content["classes"] = [
+        {part: to_base64(png_image) for part, png_image in class_pngs.items()}
+        for class_pngs in classes_pngs
+    ]
+    # Unlike the PNGs themselves, base64 text still compresses, so leave
+    # proxies free to transform it
+    return JSONResponse(content=content, headers={"Vary": "Accept"})
+
+@router.post("/all", description="Extract every section and class image of the COE PDF, "
+                                 "as a ZIP archive, or as base64 encoded PNGs in a JSON "
+                                 "object when the Accept header prefers application/json",
+             responses=Responses.all_images_response("PNG images of every section and class."))
+async def extract_all_images_from_pdf(request: Request, coe: UploadFile = File(...)):
+    logger.debug("Extracting all images from COE PDF")
 
     coe_instance = await process_coe_file(coe)
 
-    # Extract bottom image
-    bottom_image = coe_instance.get_bottom_image()
-
-    # Return the image as a StreamingResponse
-    return image_response(bottom_image)
\ No newline at end of file
+    # Extract every region and class image
+    region_images = {
+        name: getattr(coe_instance, extractor)()
+        for name, (extractor, _, _) in REGIONS.items()
+    }
+    classes_images = coe_instance.extract_classes()
+
+    # Encode the images concurrently, Pillow releases the GIL while encoding
+    loop = asyncio.get_running_loop()
+    png_images = iter(await asyncio.gather(*(
+        loop.run_in_executor(EXECUTOR, encode_png, image)
+        for image in [
+            *region_images.values(),
+            *(image for class_images in classes_images for image in class_images.values()),
+        ]
+    )))
+    region_pngs = {name: next(png_images) for name in region_images}
+    classes_pngs = [
+        {part: next(png_images) for part in class_images}
+        for class_images in classes_images
+    ]
+
+    if accepts_over(request, "application/json", "application/zip"):
+        return base64_json_response(region_pngs, classes_pngs)
+    return zip_archive_response(region_pngs, classes_pngs)